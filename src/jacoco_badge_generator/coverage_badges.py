@@ -25,10 +25,11 @@
 # SOFTWARE.
 # 
 
-import csv
 import sys
 import math
+import functools
 import pathlib
+import string
 import os
 import os.path
 import json
@@ -70,29 +71,64 @@ def generateBadge(covStr, color, badgeType="coverage") :
     color - The color for the badge.
     badgeType - The text string for a label on the badge.
     """
+    fragments, leftWidth = labelledBadgeTemplate(badgeType)
     # textLength for coverage percentage string computed
     # assuming DejaVu Sans, 110pt font.
     textLength = calculateTextLength110(covStr)
-    labelTextLength = calculateTextLength110(badgeType)
     rightWidth = math.ceil(textLength / 10) + 10
-    leftWidth = math.ceil(labelTextLength / 10) + 10
     badgeWidth = leftWidth + rightWidth
     # The -10 below is for an exta buffer on right end of badge
     rightCenter = 10 * leftWidth + rightWidth * 5 - 10
+    fields = (
+        covStr,           #0
+        color,            #1
+        str(textLength),  #2
+        str(rightWidth),  #3
+        str(badgeWidth),  #4
+        str(rightCenter)  #5
+        )
+    return "".join(
+        literal if i is None else literal + fields[i] for literal, i in fragments
+        )
+
+@functools.lru_cache(maxsize=8)
+def labelledBadgeTemplate(badgeType) :
+    """Specializes the badge template for a label, filling in
+    everything that depends only on the label, and leaving
+    placeholders for the fields that depend on the coverage
+    string. The specialized template is pre-split into a tuple of
+    (literal, fieldIndex) pairs, where fieldIndex is None for the
+    trailing literal, so that generating a badge is a simple join.
+    Cached since the same labels are used for every badge.
+    Returns: fragments, leftWidth
+
+    Keyword arguments:
+    badgeType - The text string for a label on the badge.
+    """
+    labelTextLength = calculateTextLength110(badgeType)
+    leftWidth = math.ceil(labelTextLength / 10) + 10
     # The +10 below is for an extra buffer on left end of badge
     leftCenter = 10 + leftWidth * 5
-    return badgeTemplate.format(
-        covStr,          #0
-        color,           #1
-        textLength,      #2
-        badgeType,       #3 
+    # Braces in the label must be escaped since the result
+    # is itself used as a format string.
+    escapedLabel = badgeType.replace("{", "{{").replace("}", "}}")
+    template = badgeTemplate.format(
+        "{0}",           #0 covStr
+        "{1}",           #1 color
+        "{2}",           #2 textLength
+        escapedLabel,    #3
         labelTextLength, #4
-        rightWidth,      #5
-        badgeWidth,      #6
-        rightCenter,     #7
+        "{3}",           #5 rightWidth
+        "{4}",           #6 badgeWidth
+        "{5}",           #7 rightCenter
         leftWidth,       #8
         leftCenter       #9
         )
+    fragments = tuple(
+        (literal, None if field is None else int(field))
+        for literal, field, spec, conversion in string.Formatter().parse(template)
+        )
+    return fragments, leftWidth
 
 def generateDictionaryForEndpoint(covStr, color, badgeType) :
     """Generated a Python dictionary containing all of the required
@@ -123,17 +159,41 @@ def computeCoverage(fileList) :
     missedBranches = 0
     coveredBranches = 0
     for filename in fileList :
-        with open(filename, newline='') as csvfile :
-            jacocoReader = csv.reader(csvfile)
-            for i, row in enumerate(jacocoReader) :
-                if i > 0 :
-                    missed += int(row[3])
-                    covered += int(row[4])
-                    missedBranches += int(row[5])
-                    coveredBranches += int(row[6])
+        m, c, mb, cb = countsFromReport(filename)
+        missed += m
+        covered += c
+        missedBranches += mb
+        coveredBranches += cb
     return (calculatePercentage(covered, missed),
             calculatePercentage(coveredBranches, missedBranches))
 
+def countsFromReport(filename) :
+    """Parses a single jacoco.csv file, summing the instruction
+    and branch counters over all of its rows.
+    Returns: missed, covered, missedBranches, coveredBranches
+
+    Keyword arguments:
+    filename - The filename, including path, of the jacoco.csv file.
+    """
+    missed = 0
+    covered = 0
+    missedBranches = 0
+    coveredBranches = 0
+    with open(filename, newline='') as csvfile :
+        # Only the first 3 columns (group, package, class) are text,
+        # and may be quoted and contain commas. All of the counter
+        # columns that follow are integers, so splitting from the
+        # right avoids needing a full csv parse of each row.
+        header = next(csvfile, "")
+        numCounters = len(header.split(",")) - 3
+        for row in csvfile :
+            counters = row.rsplit(",", numCounters)
+            missed += int(counters[1])
+            covered += int(counters[2])
+            missedBranches += int(counters[3])
+            coveredBranches += int(counters[4])
+    return missed, covered, missedBranches, coveredBranches
+
 def calculatePercentage(covered, missed) :
     """Calculates the coverage percentage from number of
     covered and number of missed. Returns 1 if both are 0
@@ -160,9 +220,10 @@ def coverageTruncatedToString(coverage) :
     # to avoid considering a non-passing percentage as
     # passing (e.g., if user considers 70% as passing threshold,
     # then 69.99999...% is technically not passing).
-    coverage = int(1000 * coverage) / 10
-    if coverage - int(coverage) == 0 :
-        covStr = "{0:d}%".format(int(coverage))
+    tenths = int(1000 * coverage)
+    coverage = tenths / 10
+    if tenths % 10 == 0 :
+        covStr = "{0:d}%".format(tenths // 10)
     else :
         covStr = "{0:.1f}%".format(coverage)
     return covStr, coverage
@@ -207,16 +268,26 @@ def createOutputDirectories(badgesDirectory) :
         os.umask(0)
         p.mkdir(mode=0o777, parents=True, exist_ok=True)
 
+def removeLeadingPathPrefix(path) :
+    """Removes a leading ./ and then a leading / from a path, since
+    all paths are treated as relative to the root of the repository.
+
+    Keyword arguments:
+    path - The path.
+    """
+    if path.startswith("./") :
+        path = path[2:]
+    if path.startswith("/") :
+        path = path[1:]
+    return path
+
 def splitPath(filenameWithPath) :
     """Breaks a filename including path into containing directory and filename.
 
     Keyword arguments:
     filenameWithPath - The filename including path.
     """
-    if filenameWithPath.startswith("./") :
-        filenameWithPath = filenameWithPath[2:]
-    if filenameWithPath[0] == "/" :
-        filenameWithPath = filenameWithPath[1:]
+    filenameWithPath = removeLeadingPathPrefix(filenameWithPath)
     i = filenameWithPath.rfind("/")
     if i >= 0 :
         return filenameWithPath[:i], filenameWithPath[i+1:]
@@ -230,14 +301,8 @@ def formFullPathToFile(directory, filename) :
     directory - The directory for the badges
     filename - The filename for the badge.
     """
-    if len(filename) > 1 and filename[0:2] == "./" :
-        filename = filename[2:]
-    if filename[0] == "/" :
-        filename = filename[1:]
-    if len(directory) > 1 and directory[0:2] == "./" :
-        directory = directory[2:]
-    if len(directory) > 0 and directory[0] == "/" :
-        directory = directory[1:]
+    filename = removeLeadingPathPrefix(filename)
+    directory = removeLeadingPathPrefix(directory)
     if directory == "" or directory == "." :
         return filename
     elif directory[-1] == "/" :
@@ -330,7 +395,7 @@ def getPriorCoverage(badgeFilename, whichBadge) :
     """
     if not os.path.isfile(badgeFilename) :
         return -1
-    with open(badgeFilename, "r") as f :
+    with open(badgeFilename, "r", encoding="utf-8") as f :
         priorBadge = f.read()
     i = priorBadge.find(whichBadge)
     if i < 0 :
@@ -566,10 +631,7 @@ def main(jacocoCsvFile,
         print("ERROR: Invalid value for on-missing-report.")
         sys.exit(1)
 
-    if len(badgesDirectory) > 1 and badgesDirectory[0:2] == "./" :
-        badgesDirectory = badgesDirectory[2:]
-    if len(badgesDirectory) > 0 and badgesDirectory[0] == "/" :
-        badgesDirectory = badgesDirectory[1:]
+    badgesDirectory = removeLeadingPathPrefix(badgesDirectory)
     if badgesDirectory == "." :
         badgesDirectory = ""
 
@@ -618,8 +680,8 @@ def main(jacocoCsvFile,
         if generateCoverageBadge or generateCoverageJSON :
             covStr, color = badgeCoverageStringColorPair(cov, colorCutoffs, colors)
             if generateCoverageBadge :
-                with open(coverageBadgeWithPath, "w") as badge :
-                    badge.write(generateBadge(covStr, color, coverageLabel))
+                with open(coverageBadgeWithPath, "wb") as badge :
+                    badge.write(generateBadge(covStr, color, coverageLabel).encode("utf-8"))
             if generateCoverageJSON :
                 with open(coverageJSONWithPath, "w") as endpoint :
                     json.dump(generateDictionaryForEndpoint(covStr, color, coverageLabel), endpoint, sort_keys=True)
@@ -627,8 +689,8 @@ def main(jacocoCsvFile,
         if generateBranchesBadge or generateBranchesJSON :
             covStr, color = badgeCoverageStringColorPair(branches, colorCutoffs, colors)
             if generateBranchesBadge :
-                with open(branchesBadgeWithPath, "w") as badge :
-                    badge.write(generateBadge(covStr, color, branchesLabel))
+                with open(branchesBadgeWithPath, "wb") as badge :
+                    badge.write(generateBadge(covStr, color, branchesLabel).encode("utf-8"))
             if generateBranchesJSON :
                 with open(branchesJSONWithPath, "w") as endpoint :
                     json.dump(generateDictionaryForEndpoint(covStr, color, branchesLabel), endpoint, sort_keys=True)
@@ -462,6 +462,12 @@ class TestJacocoBadgeGenerator(unittest.TestCase) :
         self.assertAlmostEqual(0.78, coverage)
         self.assertAlmostEqual(0.87, branches)
 
+    def testCountsFromReport(self) :
+        self.assertEqual((0, 1816, 100, 900), jbg.countsFromReport("tests/jacoco.csv"))
+        self.assertEqual((0, 0, 0, 44), jbg.countsFromReport("tests/jacocoDivZero.csv"))
+        self.assertEqual((0, 1816, 100, 900), jbg.countsFromReport("tests/jacocoQuoted.csv"))
+        self.assertEqual((0, 0, 0, 0), jbg.countsFromReport("tests/jacocoHeaderOnly.csv"))
+
     def testCoverageTruncatedToString_str(self) :
         self.assertEqual("100%", jbg.coverageTruncatedToString(1)[0])
         self.assertEqual("100%", jbg.coverageTruncatedToString(1.0)[0])
@@ -683,6 +689,11 @@ class TestJacocoBadgeGenerator(unittest.TestCase) :
         with open("tests/custom2.svg","r") as f :
             self.assertEqual(f.read(), badge)
 
+    def testBadgeLabelWithBraces(self) :
+        badge = jbg.generateBadge("90%", jbg.defaultColors[1], "{0} {1}")
+        self.assertEqual(2, badge.count(">{0} {1}</text>"))
+        self.assertEqual(2, badge.count(">90%</text>"))
+
     def testGenerateDictionaryForEndpoint(self) :
         testPercentages = [0, 0.599, 0.6, 0.7, 0.8, 0.899, 0.9, 0.99, 0.999, 1]
         expectedMsg = ["0%", "59.9%", "60%", "70%", "80%", "89.9%", "90%", "99%", "99.9%", "100%"]
@@ -727,6 +738,21 @@ class TestJacocoBadgeGenerator(unittest.TestCase) :
             self.assertEqual(directoryExpected, directory)
             self.assertEqual(filenameExpected, filename)
 
+    def testRemoveLeadingPathPrefix(self) :
+        cases = [ ( "", "" ),
+                  ( ".", "." ),
+                  ( "./", "" ),
+                  ( "/", "" ),
+                  ( "a", "a" ),
+                  ( "./a", "a" ),
+                  ( "/a", "a" ),
+                  ( ".//a", "a" ),
+                  ( "./a/b/", "a/b/" ),
+                  ( "/a/b/", "a/b/" )
+                  ]
+        for path, expected in cases :
+            self.assertEqual(expected, jbg.removeLeadingPathPrefix(path))
+
     def testFormPath(self) :
         cases = [ ( ".", "jacoco.svg", "jacoco.svg" ),
                   ( "./", "jacoco.svg", "jacoco.svg" ),